@@ -1,9 +1,27 @@
-import requests
+import re
+import sys
+import time
+import codecs
+import queue
+import logging
+import logging.handlers
+import secrets
+import itertools
+from collections import OrderedDict
 import dns.resolver
+import dns.asyncresolver
 import argparse
 import asyncio
 import aiohttp
-from concurrent.futures import ThreadPoolExecutor
+from aiohttp.resolver import AsyncResolver
+
+# uvloop is an optional, faster drop-in event loop (not available on Windows).
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+log = logging.getLogger('scanner')
 
 # A dictionary mapping provider domains to error signatures that indicate an unclaimed service.
 # These values were inspired by resources like https://github.com/EdOverflow/can-i-take-over-xyz
@@ -48,38 +66,231 @@ ERROR_SIGNATURES = {
     'worksites.net': 'Hello! Sorry, but the website you&rsquo;re looking for doesn&rsquo;t exist.'
 }
 
+# A single alternation over all provider domains (longest first, so the most specific
+# provider wins) used to find which provider a CNAME target belongs to in one search.
+# DNS names are case-insensitive, so the match ignores case.
+PROVIDER_RE = re.compile('|'.join(sorted(map(re.escape, ERROR_SIGNATURES), key=len, reverse=True)), re.IGNORECASE)
+
+# ERROR_SIGNATURES is partitioned by how each signature is observed:
+# - STATUS_SIGNATURES: takeover is indicated by the HTTP status code alone (e.g. 'HTTP_STATUS=301').
+# - NXDOMAIN_PROVIDERS: takeover is indicated by the CNAME target failing to resolve.
+# - BODY_SIGNATURES: takeover is indicated by an error message in the response body.
+STATUS_SIGNATURES = {
+    provider: int(signature.split('=', 1)[1])
+    for provider, signature in ERROR_SIGNATURES.items()
+    if signature.startswith('HTTP_STATUS=')
+}
+NXDOMAIN_PROVIDERS = {provider for provider, signature in ERROR_SIGNATURES.items() if signature == 'NXDOMAIN'}
+BODY_SIGNATURES = {
+    provider: signature
+    for provider, signature in ERROR_SIGNATURES.items()
+    if provider not in STATUS_SIGNATURES and provider not in NXDOMAIN_PROVIDERS
+}
+
+# HEAD statuses that warrant fetching the body to look for a signature; any other
+# status means the service is live. Redirects are included because the GET follows
+# them (e.g. http -> https) to the page that may carry the error message, and 405
+# covers servers that reject HEAD requests.
+BODY_CHECK_STATUSES = frozenset({200, 301, 302, 303, 307, 308, 404, 405, 500, 503})
+
+# Response bodies are streamed in chunks and matching stops after MAX_BODY_BYTES,
+# since signatures almost always appear near the start of the page.
+CHUNK_SIZE = 8192
+MAX_BODY_BYTES = 64 * 1024
+
+# Public DNS resolvers used instead of the system resolver. Queries are spread across
+# them round-robin to avoid per-resolver rate limits and reduce tail latency.
+NAMESERVERS = ['1.1.1.1', '8.8.8.8', '9.9.9.9', '8.8.4.4', '1.0.0.1']
+
+def _build_resolver(nameserver):
+    """
+    Builds a dnspython async resolver that queries only nameserver, with short
+    timeouts so a slow or unresponsive resolver cannot stall the scan.
+    """
+    resolver = dns.asyncresolver.Resolver(configure=False)
+    resolver.nameservers = [nameserver]
+    resolver.timeout = 1
+    resolver.lifetime = 2
+    return resolver
+
+_RESOLVER_POOL = itertools.cycle([_build_resolver(nameserver) for nameserver in NAMESERVERS])
+
+# Upper bound on concurrent in-flight DNS queries; very high fan-out can make the resolver hang.
+DNS_CONCURRENCY = 500
+# Upper bound on wordlist candidates being enumerated at once.
+ENUM_CONCURRENCY = 500
+# Discovered subdomains are queued (up to SCAN_QUEUE_SIZE) for a fixed pool of scan workers.
+SCAN_QUEUE_SIZE = 1000
+SCAN_WORKERS = 200
+
+# In-process LRU DNS cache mapping (name, qtype) to (expiry, records), holding at most
+# DNS_CACHE_SIZE entries so memory stays bounded on large wordlists.
+# records is a tuple of record strings, an empty tuple for NoAnswer, or None for NXDOMAIN.
+_DNS_CACHE = OrderedDict()
+DNS_CACHE_SIZE = 16384
+# Negative answers carry no rrset TTL, so they are kept for a fixed number of seconds.
+NEGATIVE_CACHE_TTL = 60
+_CACHE_MISS = object()
+
+# The DNS semaphore is created inside the running event loop: on Python < 3.10 an
+# asyncio.Semaphore binds to the loop current at creation, which at import time is
+# not the loop started by asyncio.run().
+_dns_semaphore = None
+_dns_semaphore_loop = None
+
 ###############################################################################
-# Synchronous DNS lookup function (using dnspython)
+# Asynchronous DNS lookup functions (using dnspython's asyncresolver)
 ###############################################################################
-def get_cname_record(subdomain):
+def _dns_cache_get(name, qtype):
+    """
+    Returns the cached records for (name, qtype), or _CACHE_MISS if the entry
+    is absent or its TTL has expired. Expired entries are removed, and hits are
+    marked as most recently used.
+    """
+    key = (name, qtype)
+    entry = _DNS_CACHE.get(key)
+    if entry is None:
+        return _CACHE_MISS
+    if entry[0] <= time.monotonic():
+        del _DNS_CACHE[key]
+        return _CACHE_MISS
+    _DNS_CACHE.move_to_end(key)
+    return entry[1]
+
+def _get_dns_semaphore():
+    """
+    Returns the semaphore bounding in-flight DNS queries, creating it for the
+    running event loop on first use (or when a new loop is running).
     """
-    Query the DNS for the CNAME record of a given subdomain.
+    global _dns_semaphore, _dns_semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _dns_semaphore_loop is not loop:
+        _dns_semaphore = asyncio.Semaphore(DNS_CONCURRENCY)
+        _dns_semaphore_loop = loop
+    return _dns_semaphore
+
+def _dns_cache_put(name, qtype, ttl, records):
+    """
+    Stores records for (name, qtype) for ttl seconds, evicting the least recently
+    used entries once the cache holds more than DNS_CACHE_SIZE entries.
+    """
+    key = (name, qtype)
+    _DNS_CACHE[key] = (time.monotonic() + ttl, records)
+    _DNS_CACHE.move_to_end(key)
+    while len(_DNS_CACHE) > DNS_CACHE_SIZE:
+        _DNS_CACHE.popitem(last=False)
+
+async def resolve_cached(name, qtype):
+    """
+    Asynchronously resolves a DNS record, honouring the record TTL via the LRU _DNS_CACHE.
+    Returns a tuple of record strings (without trailing dots), an empty tuple if the
+    name exists but has no record of that type, or None if the name does not exist.
+    Timeouts, resolver failures and malformed names are not cached and propagate to the caller.
+    """
+    records = _dns_cache_get(name, qtype)
+    if records is not _CACHE_MISS:
+        return records
+    try:
+        async with _get_dns_semaphore():
+            answers = await next(_RESOLVER_POOL).resolve(name, qtype)
+    except dns.resolver.NoAnswer:
+        _dns_cache_put(name, qtype, NEGATIVE_CACHE_TTL, ())
+        return ()
+    except dns.resolver.NXDOMAIN:
+        _dns_cache_put(name, qtype, NEGATIVE_CACHE_TTL, None)
+        return None
+    records = tuple(rdata.to_text().rstrip('.') for rdata in answers)
+    _dns_cache_put(name, qtype, answers.rrset.ttl, records)
+    return records
+
+async def get_cname_record_async(subdomain):
+    """
+    Asynchronously query the DNS for the CNAME record of a given subdomain.
     Returns the canonical name (if found) as a string (without the trailing dot)
-    or None if no CNAME record is present or on error.
+    or None if no CNAME record is present or on error (including malformed names
+    from the wordlist, such as empty or over-long labels).
     """
     try:
-        answers = dns.resolver.resolve(subdomain, 'CNAME')
-        for rdata in answers:
-            return str(rdata.target).rstrip('.')
-    except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN, dns.exception.Timeout):
+        records = await resolve_cached(subdomain, 'CNAME')
+    except (asyncio.TimeoutError, dns.exception.DNSException):
         return None
+    return records[0] if records else None
+
+async def resolve_a_records(name):
+    """
+    Asynchronously resolves the A records of a name.
+    Returns a frozenset of IP address strings, or None if the name has no A records
+    or on error (including malformed names).
+    """
+    try:
+        records = await resolve_cached(name, 'A')
+    except (asyncio.TimeoutError, dns.exception.DNSException):
+        return None
+    return frozenset(records) if records else None
+
+async def async_check_cname_target(cname):
+    """
+    Asynchronously checks whether a CNAME target still exists by resolving its A record.
+    Returns False if the target is NXDOMAIN (i.e. likely vulnerable), otherwise True.
+    A timeout or resolver failure is not treated as evidence of a dangling record.
+    """
+    try:
+        return await resolve_cached(cname, 'A') is not None
+    except (asyncio.TimeoutError, dns.exception.DNSException):
+        return True
 
 ###############################################################################
 # Asynchronous HTTP check using aiohttp
 ###############################################################################
-async def async_check_service_status(subdomain, session):
+async def body_contains_signature(response, signature):
+    """
+    Streams the response body and searches each chunk for signature, stopping at
+    the first match or after MAX_BODY_BYTES have been read. The body is decoded
+    using the charset declared by the response, defaulting to UTF-8.
+    Returns True if the signature was found, otherwise False.
     """
-    Asynchronously sends an HTTP GET request to the subdomain and checks whether
-    the response content contains any known error signatures indicating an unclaimed service.
+    try:
+        decoder = codecs.getincrementaldecoder(response.charset or 'utf-8')(errors='replace')
+    except LookupError:
+        # Unknown charset name in the Content-Type header.
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    # Characters carried over between chunks so a signature split across a boundary is still found.
+    overlap = len(signature) - 1
+    tail = ''
+    bytes_read = 0
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        bytes_read += len(chunk)
+        text = tail + decoder.decode(chunk)
+        if signature in text:
+            return True
+        if bytes_read >= MAX_BODY_BYTES:
+            break
+        tail = text[-overlap:] if overlap else ''
+    return False
+
+async def async_check_service_status(subdomain, provider, session):
+    """
+    Asynchronously checks whether the subdomain's service looks unclaimed, given the
+    provider its CNAME points at (or None if it matches no known provider).
+    A HEAD request is sent first; providers identified by status code alone are decided
+    from it, and only if the status can carry an error page is a bounded HTTP GET
+    (at most MAX_BODY_BYTES, requested via a Range header) checked for known error signatures.
     Returns False if a signature is found (i.e. likely vulnerable), otherwise True.
     """
     url = f'http://{subdomain}'
     try:
-        async with session.get(url, timeout=5) as response:
-            text = await response.text()
-            for provider, signature in ERROR_SIGNATURES.items():
-                if provider in subdomain and signature in text:
-                    return False  # Service likely unclaimed
+        async with session.head(url, allow_redirects=False, timeout=5) as head:
+            status = head.status
+        if provider is None:
+            return True  # No signature can apply, so the body is not needed
+        if provider in STATUS_SIGNATURES:
+            return status != STATUS_SIGNATURES[provider]
+        if status not in BODY_CHECK_STATUSES:
+            return True
+        headers = {'Range': f'bytes=0-{MAX_BODY_BYTES - 1}'}
+        async with session.get(url, headers=headers, timeout=5) as response:
+            if await body_contains_signature(response, BODY_SIGNATURES[provider]):
+                return False  # Service likely unclaimed
             return True  # Service appears active
     except asyncio.TimeoutError:
         return False
@@ -89,77 +300,196 @@ async def async_check_service_status(subdomain, session):
 ###############################################################################
 # Asynchronous scan function that combines DNS lookup and HTTP check
 ###############################################################################
-async def async_scan_subdomain(subdomain, loop):
+async def async_scan_subdomain(subdomain, session):
     """
     Asynchronously scans a subdomain for potential takeover vulnerability.
-    - Uses run_in_executor to call the synchronous DNS lookup (get_cname_record).
-    - Uses an aiohttp session to perform an asynchronous HTTP GET request.
+    - Uses dnspython's asyncresolver to look up the CNAME record (get_cname_record_async).
+    - If the CNAME points at an NXDOMAIN provider, resolves the target instead of using HTTP.
+    - Otherwise uses the shared aiohttp session to perform asynchronous HTTP requests.
     Returns a tuple (subdomain, cname) if a vulnerability is detected; otherwise, None.
     """
-    # Run the DNS query in the default executor to avoid blocking the event loop.
-    cname = await loop.run_in_executor(None, get_cname_record, subdomain)
+    cname = await get_cname_record_async(subdomain)
     if cname:
-        print(f"[INFO] {subdomain} has CNAME: {cname}")
-        # Create an aiohttp session for the HTTP request.
-        async with aiohttp.ClientSession() as session:
-            active = await async_check_service_status(subdomain, session)
-            if not active:
-                print(f"[ALERT] Potential subdomain takeover vulnerability detected on {subdomain}!")
-                return (subdomain, cname)
-            else:
-                print(f"[INFO] {subdomain} appears active.")
+        log.info("[INFO] %s has CNAME: %s", subdomain, cname)
+        # The provider is identified from the CNAME target, which is where its domain appears.
+        match = PROVIDER_RE.search(cname)
+        provider = match.group(0).lower() if match else None
+        if provider in NXDOMAIN_PROVIDERS:
+            # These providers are only detectable by the CNAME target failing to resolve.
+            active = await async_check_cname_target(cname)
+        else:
+            active = await async_check_service_status(subdomain, provider, session)
+        if not active:
+            log.info("[ALERT] Potential subdomain takeover vulnerability detected on %s!", subdomain)
+            return (subdomain, cname)
+        else:
+            log.info("[INFO] %s appears active.", subdomain)
     else:
-        print(f"[INFO] {subdomain} has no CNAME record (might be a bare A record).")
+        log.info("[INFO] %s has no CNAME record (might be a bare A record).", subdomain)
     return None
 
 ###############################################################################
-# Multi-threaded subdomain enumeration using ThreadPoolExecutor
+# Asynchronous DNS-only subdomain enumeration
 ###############################################################################
-def check_subdomain_existence(full_domain):
+async def async_check_subdomain_existence(full_domain, wildcard_ips=None):
     """
-    Synchronously checks if a subdomain exists by sending an HTTP HEAD request.
-    Returns the full domain (without the scheme) if the request does not raise a ConnectionError;
-    otherwise, returns None.
+    Asynchronously checks if a subdomain exists using DNS only.
+    A subdomain exists if it has a CNAME record (even a dangling one, which is exactly
+    what the scan looks for) or A records. The CNAME answer is cached in _DNS_CACHE,
+    so the scanning phase does not query it again.
+    If wildcard_ips is given, subdomains resolving to exactly that address set are
+    treated as wildcard DNS answers and skipped.
+    Returns the full domain if it exists; otherwise, returns None.
     """
-    url = f"http://{full_domain}"
-    try:
-        # Using HEAD is faster since it only fetches headers.
-        requests.head(url, timeout=5)
-        return full_domain
-    except requests.ConnectionError:
+    if await get_cname_record_async(full_domain) is None:
+        # A cached NXDOMAIN for the CNAME query means the name does not exist at all.
+        if _dns_cache_get(full_domain, 'CNAME') is None or await resolve_a_records(full_domain) is None:
+            return None
+    if wildcard_ips and await resolve_a_records(full_domain) == wildcard_ips:
         return None
+    return full_domain
+
+def read_subdomain_prefixes(file_name):
+    """
+    Lazily yields subdomain prefixes from a wordlist file, one line at a time,
+    dropping blanks and duplicates while preserving the wordlist order.
+    """
+    seen = set()
+    with open(file_name, 'r') as f:
+        for line in f:
+            prefix = line.strip()
+            if prefix and prefix not in seen:
+                seen.add(prefix)
+                yield prefix
+
+async def bounded_as_completed(func, items, limit):
+    """
+    Runs func(item) for every item with at most limit tasks in flight, pulling items
+    lazily so memory stays proportional to limit rather than to the number of items.
+    Yields the results in completion order. If a task raises, or the caller stops
+    iterating, the remaining tasks are cancelled rather than left running.
+    """
+    pending = set()
+    try:
+        for item in items:
+            if len(pending) >= limit:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            pending.add(asyncio.create_task(func(item)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
 
-def subdomenum(domain, file_name):
+async def subdomenum(domain, file_name):
     """
     Enumerates subdomains using a brute force wordlist provided in a text file.
-    Uses multi-threading (ThreadPoolExecutor) to concurrently test subdomain existence.
-    Returns a list of discovered subdomain strings (e.g. 'www.example.com').
+    Resolves candidates concurrently over DNS, with no HTTP requests; the wordlist is
+    streamed so only a bounded number of candidates are in flight at once.
+    Yields discovered subdomain strings (e.g. 'www.example.com') as they are found.
     """
-    discovered_subdomains = []
+    # A random name that still resolves means the domain has wildcard DNS, in which
+    # case every probe would succeed; remember its addresses to filter candidates.
+    wildcard_ips = await resolve_a_records(f"{secrets.token_hex(8)}.{domain}")
+    if wildcard_ips:
+        log.info("[INFO] %s has wildcard DNS (%s); skipping matching subdomains.", domain, ', '.join(sorted(wildcard_ips)))
 
-    # Read the list of subdomain prefixes from the text file.
-    with open(file_name, 'r') as f:
-        subdomain_prefixes = f.read().splitlines()
-
-    # Create the list of full domain names (without the http:// prefix)
-    full_domains = [f"{sub}.{domain}" for sub in subdomain_prefixes]
-
-    # Use a ThreadPoolExecutor to concurrently check for existence of each subdomain.
-    with ThreadPoolExecutor(max_workers=20) as executor:
-        # Map the check_subdomain_existence function over the full_domains list.
-        results = executor.map(check_subdomain_existence, full_domains)
-    
-    # Filter out None results and add to discovered_subdomains.
-    for res in results:
-        if res is not None:
-            discovered_subdomains.append(res)
-            print(f"[+] Discovered subdomain: {res}")
+    # Lazily build the full domain names (without the http:// prefix).
+    dot_domain = '.' + domain
+    full_domains = (prefix + dot_domain for prefix in read_subdomain_prefixes(file_name))
+
+    async def check(full_domain):
+        return await async_check_subdomain_existence(full_domain, wildcard_ips)
 
-    return discovered_subdomains
+    # Filter out None results and yield discovered subdomains.
+    async for res in bounded_as_completed(check, full_domains, ENUM_CONCURRENCY):
+        if res is not None:
+            log.info("[+] Discovered subdomain: %s", res)
+            yield res
 
 ###############################################################################
 # Main execution and argument parsing
 ###############################################################################
+async def async_main(domain, textfile):
+    """
+    Streams subdomains discovered over DNS through a bounded queue to a pool of
+    SCAN_WORKERS workers, so the number of queued and in-flight subdomains stays
+    bounded regardless of wordlist size. The DNS cache is capped at DNS_CACHE_SIZE
+    entries; only the wordlist deduplication set grows with the number of unique prefixes.
+    The workers scan over a single shared aiohttp session so that keep-alive
+    connections, the DNS cache and the SSL context are reused across all tasks.
+    Hostnames are resolved with the c-ares based AsyncResolver (requires aiodns)
+    against NAMESERVERS instead of aiohttp's default thread pool resolver.
+    Returns the list of (subdomain, cname) tuples for potentially vulnerable subdomains.
+    """
+    resolver = AsyncResolver(nameservers=NAMESERVERS)
+    connector = aiohttp.TCPConnector(resolver=resolver, limit=100, ttl_dns_cache=300, use_dns_cache=True)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        scan_queue = asyncio.Queue(maxsize=SCAN_QUEUE_SIZE)
+        vulnerable = []
+
+        async def produce():
+            # Enumerate subdomains using the provided wordlist, then send one
+            # sentinel per worker to signal that there is nothing left to scan.
+            async for sub in subdomenum(domain, textfile):
+                await scan_queue.put(sub)
+            for _ in range(SCAN_WORKERS):
+                await scan_queue.put(None)
+
+        async def scan_worker():
+            # Asynchronously scan each queued subdomain for takeover vulnerabilities.
+            while (sub := await scan_queue.get()) is not None:
+                result = await async_scan_subdomain(sub, session)
+                if result is not None:
+                    vulnerable.append(result)
+
+        await asyncio.gather(produce(), *(scan_worker() for _ in range(SCAN_WORKERS)))
+        return vulnerable
+
+def run(domain, textfile):
+    """
+    Scans domain using the textfile wordlist and writes any potentially
+    vulnerable subdomains to vulnerable_subdomains.txt.
+    """
+    log.info("Domain: %s, Wordlist: %s", domain, textfile)
+
+    # aiodns does not support the Proactor event loop used by default on Windows.
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    elif uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+    vulnerable = asyncio.run(async_main(domain, textfile))
+    for sub, cname in vulnerable:
+        log.info("[+] Discovered vulnerable subdomain: %s (CNAME: %s)", sub, cname)
+
+    # Write potentially vulnerable subdomains to a file, one tab-separated
+    # "subdomain<TAB>cname" line each, in a single write.
+    with open("vulnerable_subdomains.txt", "w") as f:
+        f.write(''.join(f"{sub}\t{cname}\n" for sub, cname in vulnerable))
+
+def setup_logging():
+    """
+    Routes the scanner's log records through a QueueHandler so coroutines never block
+    on stdout; a QueueListener thread writes them out. Returns the started listener,
+    which must be stopped to flush pending records.
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter('%(message)s'))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    log.addHandler(logging.handlers.QueueHandler(log_queue))
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    listener.start()
+    return listener
+
 def main():
     # Parse command line arguments for the domain and text file.
     parser = argparse.ArgumentParser(
@@ -171,27 +501,11 @@ def main():
     args = parser.parse_args()
     domain = args.domain
     textfile = args.textfile
-    print(f"Domain: {domain}, Wordlist: {textfile}")
-
-    # Enumerate subdomains using the provided wordlist (using multi-threading)
-    discovered_subdomains = subdomenum(domain, textfile)
-
-    # Asynchronously scan each discovered subdomain for takeover vulnerabilities.
-    loop = asyncio.get_event_loop()
-    # Prepare a list of async scanning tasks.
-    tasks = [async_scan_subdomain(sub, loop) for sub in discovered_subdomains]
-    # Gather results concurrently.
-    vulnerable_results = loop.run_until_complete(asyncio.gather(*tasks))
-
-    # Filter out None results from vulnerable_results.
-    vulnerable = [result for result in vulnerable_results if result is not None]
-    for sub, cname in vulnerable:
-        print(f"[+] Discovered vulnerable subdomain: {sub} (CNAME: {cname})")
-
-    # Write potentially vulnerable subdomains to a file.
-    with open("vulnerable_subdomains.txt", "w") as f:
-        for item in vulnerable:
-            print(item, file=f)
+    listener = setup_logging()
+    try:
+        run(domain, textfile)
+    finally:
+        listener.stop()
 
 if __name__ == "__main__":
     main()